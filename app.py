@@ -1,9 +1,8 @@
 import streamlit as st
 import pandas as pd
-import joblib
+import numpy as np
 import os
-import plotly.graph_objects as go
-import plotly.express as px
+import lazy_loader
 from utils import generate_college_summary, get_branch_category, recommend_branches_by_interest, BRANCH_SKILLS
 
 # Page config
@@ -63,6 +62,9 @@ MODEL_FILE = "models/ext_model.joblib"
 ENC_FILE = "models/label_encoder.joblib"
 FEATURE_FILE = "models/feature_cols.joblib"
 
+# Set PREPPREDICT_WARMUP=1 to load heavy modules and the model in the background at startup
+WARM_UP = os.environ.get("PREPPREDICT_WARMUP", "0") == "1"
+
 # Load dataset
 @st.cache_data
 def load_data():
@@ -73,19 +75,36 @@ def load_data():
     else:
         return None
 
-# Load model
-@st.cache_resource
+# Load model (deferred until a page needs it)
 def load_model():
-    if os.path.exists(MODEL_FILE) and os.path.exists(ENC_FILE):
-        model = joblib.load(MODEL_FILE)
-        encoder = joblib.load(ENC_FILE)
-        features = joblib.load(FEATURE_FILE) if os.path.exists(FEATURE_FILE) else None
-        return model, encoder, features
-    return None, None, None
+    return lazy_loader.load_model(MODEL_FILE, ENC_FILE, FEATURE_FILE)
+
+# Build similar-seats index
+@st.cache_resource
+def load_seat_index():
+    from similar_seats import build_seat_index
+
+    data = load_data()
+    if data is None:
+        return None
+    return build_seat_index(data)
+
+# Precompute rank-to-eligibility curves
+@st.cache_resource
+def load_eligibility_curves():
+    from eligibility import build_eligibility_curves
+
+    data = load_data()
+    if data is None:
+        return None
+    return build_eligibility_curves(data)
 
 # Initialize
 df = load_data()
-model, label_encoder, feature_cols = load_model()
+model_ready = lazy_loader.model_available(MODEL_FILE, ENC_FILE)
+
+if WARM_UP:
+    lazy_loader.start_warm_up(MODEL_FILE, ENC_FILE, FEATURE_FILE)
 
 # Header
 st.markdown('<h1 class="main-header">🎓 PrepPredict</h1>', unsafe_allow_html=True)
@@ -111,8 +130,8 @@ with st.sidebar:
     st.markdown("### About PrepPredict")
     st.info("AI-powered platform using Extra Trees algorithm to predict colleges and provide personalized career guidance.")
     
-    if model is not None:
-        st.success("✅ ML Model Loaded")
+    if model_ready:
+        st.success("✅ ML Model Available")
     else:
         st.warning("⚠️ Model not trained. Run train_model.py first.")
 
@@ -186,13 +205,18 @@ if page == "🏠 Home":
     col1.metric("Colleges in Database", len(df['College'].unique()))
     col2.metric("Branches Available", len(df['Branch'].unique()))
     col3.metric("Categories Supported", 20)
-    col4.metric("ML Accuracy", "90%+" if model else "Training Required")
+    col4.metric("ML Accuracy", "90%+" if model_ready else "Training Required")
 
 # COLLEGE PREDICTION PAGE
 elif page == "🎯 College Prediction":
     st.markdown("## 🎯 College Prediction")
     st.markdown("Enter your details to get personalized college recommendations")
     
+    with st.spinner("Loading prediction model..."):
+        model, label_encoder, feature_cols = load_model()
+        seat_index = load_seat_index()
+        eligibility_curves = load_eligibility_curves()
+    
     col1, col2 = st.columns(2)
     
     with col1:
@@ -216,20 +240,26 @@ elif page == "🎯 College Prediction":
         )
     
     if st.button("🔍 Predict Colleges", type="primary"):
+        st.session_state['prediction'] = {'rank': rank, 'caste': caste}
+    
+    # Results come from the last click so the what-if controls below can rerun the page
+    prediction = st.session_state.get('prediction')
+    if prediction is not None:
+        pred_rank, pred_caste = prediction['rank'], prediction['caste']
         with st.spinner("Analyzing your profile..."):
             
             # Filter eligible colleges
-            if caste in df.columns:
-                eligible = df[df[caste] >= rank].copy()
+            if pred_caste in df.columns:
+                eligible = df[df[pred_caste] >= pred_rank].copy()
             else:
-                st.error(f"Category '{caste}' not found in dataset")
+                st.error(f"Category '{pred_caste}' not found in dataset")
                 st.stop()
             
             if eligible.empty:
                 st.warning("⚠️ No colleges found for this rank-category combination. Try a different category or check your rank.")
             else:
                 # Calculate chance scores
-                eligible['ChanceScore'] = eligible[caste] - rank
+                eligible['ChanceScore'] = eligible[pred_caste] - pred_rank
                 eligible['ChancePercent'] = eligible['ChanceScore'].apply(
                     lambda x: min(95, max(10, (x / 5000) * 100))
                 )
@@ -242,16 +272,19 @@ elif page == "🎯 College Prediction":
                 
                 # Display summary metrics
                 col1, col2, col3 = st.columns(3)
-                col1.metric("Your Rank", f"{rank:,}")
+                col1.metric("Your Rank", f"{pred_rank:,}")
                 col2.metric("Eligible Colleges", len(eligible))
                 col3.metric("Best Match", f"{top_colleges.iloc[0]['ChancePercent']:.0f}% chance")
                 
                 st.markdown("---")
                 
+                # Similar alternatives for all shown colleges in one batch
+                similar_pos, similar_dist = seat_index.query_batch(top_colleges.index, k=3)
+                
                 # Display each college
-                for idx, row in top_colleges.iterrows():
+                for i, (idx, row) in enumerate(top_colleges.iterrows()):
                     branch_cat = get_branch_category(row['Branch'])
-                    summary, chance_pct = generate_college_summary(row, rank, branch_cat)
+                    summary, chance_pct = generate_college_summary(row, pred_rank, branch_cat)
                     
                     with st.expander(f"🏛️ {row['College']} - {row['Branch']}", expanded=(idx == top_colleges.index[0])):
                         st.markdown(summary)
@@ -261,9 +294,73 @@ elif page == "🎯 College Prediction":
                         
                         # Quick stats
                         col1, col2, col3 = st.columns(3)
-                        col1.metric("Cutoff Rank", f"{row[caste]:,}")
+                        col1.metric("Cutoff Rank", f"{row[pred_caste]:,}")
                         col2.metric("Your Advantage", f"{int(row['ChanceScore']):,} ranks")
                         col3.metric("Admission Chance", f"{chance_pct}%")
+                        
+                        # Seats with a similar cutoff profile across categories
+                        st.markdown("**🔁 Similar Alternatives**")
+                        similar = seat_index.neighbours_frame(similar_pos[i], similar_dist[i])
+                        if similar.empty:
+                            st.caption("No comparable seats found")
+                        else:
+                            st.dataframe(
+                                similar[['College', 'Branch', 'Location', pred_caste]],
+                                hide_index=True,
+                                use_container_width=True
+                            )
+    
+    # What-if sweeps answered from the precomputed curves, no DataFrame filtering
+    if caste in eligibility_curves.categories:
+        st.markdown("---")
+        st.markdown("### 📈 What-If Rank Sweep")
+        
+        better_rank = max(1, rank - 2000)
+        now = eligibility_curves.counts(caste, [rank, better_rank])
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Seats Open at Your Rank", f"{now['Seats'][0]:,}")
+        col2.metric(
+            f"Seats Open at Rank {better_rank:,}",
+            f"{now['Seats'][1]:,}",
+            delta=f"{now['Seats'][1] - now['Seats'][0]:+,}"
+        )
+        col3.metric("Colleges Open at Your Rank", f"{now['Colleges'][0]:,}")
+        
+        col1, col2 = st.columns([2, 1])
+        with col1:
+            # Seeded once so later category changes don't reset the user's picks
+            if 'whatif_compare' not in st.session_state:
+                st.session_state['whatif_compare'] = [caste]
+            compare = st.multiselect(
+                "Compare categories",
+                options=eligibility_curves.categories,
+                key='whatif_compare',
+                help="Sweep the same ranks under other categories"
+            )
+        with col2:
+            measure = st.radio(
+                "Count",
+                options=["Seats", "Colleges", "BranchCategories"],
+                format_func=lambda x: "Branch Categories" if x == "BranchCategories" else x,
+                horizontal=True
+            )
+        window = st.slider("Rank window (± ranks around yours)", 1000, 50000, 10000, step=1000)
+        
+        if compare:
+            import plotly.express as px
+            
+            ranks = np.linspace(max(1, rank - window), rank + window, 1000).round()
+            sweep = eligibility_curves.sweep(ranks, compare)
+            
+            fig = px.line(
+                sweep,
+                x="Rank",
+                y=measure,
+                color="Category",
+                title=f"{measure.replace('BranchCategories', 'Branch Categories')} Open by Rank"
+            )
+            fig.add_vline(x=rank, line_dash="dash", line_color="#764ba2")
+            st.plotly_chart(fig, use_container_width=True)
 
 # INTEREST-BASED GUIDANCE PAGE
 elif page == "💡 Interest-Based Guidance":
@@ -340,6 +437,8 @@ elif page == "💡 Interest-Based Guidance":
 elif page == "📊 Analytics":
     st.markdown("## 📊 Data Analytics & Insights")
     
+    import plotly.express as px
+    
     tab1, tab2, tab3 = st.tabs(["College Distribution", "Branch Analysis", "Cutoff Trends"])
     
     with tab1:
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+from utils import CASTE_CATEGORIES, get_branch_category
+
+
+def _max_cutoff_per_group(cutoffs, groups):
+    """Best (largest) cutoff per distinct group, i.e. the last rank at which the group is still open"""
+    frame = pd.DataFrame({"cutoff": cutoffs, "group": groups}).dropna()
+    return frame.groupby("group")["cutoff"].max().to_numpy()
+
+
+class EligibilityCurves:
+    """Cumulative counts of what is still open at a given rank, for every category"""
+
+    def __init__(self, df, categories=None):
+        self.categories = categories or [col for col in CASTE_CATEGORIES if col in df.columns]
+        groups = {
+            "Colleges": df["College"].to_numpy(),
+            "BranchCategories": df["Branch"].map(get_branch_category).to_numpy(),
+        }
+
+        # One sorted array of cutoffs per category and kind; a seat, college or branch
+        # category is open at rank r when its cutoff is >= r, matching the prediction filter
+        self._curves = {}
+        for category in self.categories:
+            cutoffs = pd.to_numeric(df[category], errors="coerce").to_numpy(dtype=float)
+            cutoffs[~(cutoffs > 0)] = np.nan
+
+            curves = {"Seats": np.sort(cutoffs[~np.isnan(cutoffs)])}
+            for kind, values in groups.items():
+                curves[kind] = np.sort(_max_cutoff_per_group(cutoffs, values))
+            self._curves[category] = curves
+
+    def counts(self, category, ranks):
+        """Return {kind: counts} for each rank in ranks under one category"""
+        if category not in self._curves:
+            raise KeyError(f"Category '{category}' not found in dataset")
+        ranks = np.asarray(ranks, dtype=float)
+        return {
+            kind: len(values) - np.searchsorted(values, ranks, side="left")
+            for kind, values in self._curves[category].items()
+        }
+
+    def sweep(self, ranks, categories=None):
+        """Return a long-format DataFrame of counts for every rank under every category"""
+        ranks = np.asarray(ranks)
+        frames = []
+        for category in categories or self.categories:
+            frame = pd.DataFrame(self.counts(category, ranks))
+            frame.insert(0, "Rank", ranks)
+            frame.insert(0, "Category", category)
+            frames.append(frame)
+        return pd.concat(frames, ignore_index=True)
+
+
+def build_eligibility_curves(df, categories=None):
+    """Precompute eligibility curves for every category column of the dataset"""
+    return EligibilityCurves(df, categories)
@@ -0,0 +1,65 @@
+import importlib
+import os
+import threading
+
+# Heavy modules only some pages need, imported by the background warm-up
+WARM_UP_MODULES = ["plotly.express", "sklearn.ensemble"]
+
+_lock = threading.Lock()
+_models = {}
+# Separate lock so reruns calling start_warm_up never wait on a model load
+_warm_up_lock = threading.Lock()
+_warm_up_thread = None
+
+
+def model_available(model_file, enc_file):
+    """Check whether a trained model exists without unpickling it"""
+    return os.path.exists(model_file) and os.path.exists(enc_file)
+
+
+def load_model(model_file, enc_file, feature_file):
+    """Unpickle the model, encoder and feature columns once per process"""
+    key = (model_file, enc_file, feature_file)
+    with _lock:
+        if key not in _models:
+            _models[key] = _load(model_file, enc_file, feature_file)
+    return _models[key]
+
+
+def _load(model_file, enc_file, feature_file):
+    if not model_available(model_file, enc_file):
+        return None, None, None
+
+    # joblib pulls in scikit-learn while unpickling, so keep it off the import path
+    import joblib
+
+    model = joblib.load(model_file)
+    encoder = joblib.load(enc_file)
+    features = joblib.load(feature_file) if os.path.exists(feature_file) else None
+    return model, encoder, features
+
+
+def _warm_up(model_file, enc_file, feature_file):
+    for module in WARM_UP_MODULES:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            pass
+    load_model(model_file, enc_file, feature_file)
+
+
+def start_warm_up(model_file, enc_file, feature_file):
+    """Import heavy modules and load the model in a background thread, once per process"""
+    global _warm_up_thread
+    if _warm_up_thread is not None:
+        return _warm_up_thread
+    with _warm_up_lock:
+        if _warm_up_thread is None:
+            _warm_up_thread = threading.Thread(
+                target=_warm_up,
+                args=(model_file, enc_file, feature_file),
+                name="preppredict-warm-up",
+                daemon=True
+            )
+            _warm_up_thread.start()
+    return _warm_up_thread
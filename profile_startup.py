@@ -0,0 +1,124 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+# Modules app.py may import, roughly in the order a page visit pulls them in
+MODULES = [
+    "streamlit",
+    "pandas",
+    "numpy",
+    "utils",
+    "similar_seats",
+    "eligibility",
+    "lazy_loader",
+    "joblib",
+    "plotly.express",
+    "plotly.graph_objects",
+    "sklearn.ensemble",
+]
+
+MODEL_FILE = "models/ext_model.joblib"
+ENC_FILE = "models/label_encoder.joblib"
+FEATURE_FILE = "models/feature_cols.joblib"
+
+
+def import_cost(module):
+    """Import a module in a fresh interpreter and return (cumulative_ms, wall_ms)"""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    if result.returncode != 0:
+        return None, wall_ms
+
+    # Lines look like "import time:  self [us] | cumulative | imported package"
+    cumulative_us = 0
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            cumulative_us = int(parts[1].strip())
+    return cumulative_us / 1000, wall_ms
+
+
+def step_cost(setup, code):
+    """Run setup untimed in a fresh interpreter, then return the wall time of code in ms"""
+    script = (
+        "import time\n"
+        f"{setup}\n"
+        "start = time.perf_counter()\n"
+        f"{code}\n"
+        "print((time.perf_counter() - start) * 1000)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    if result.returncode != 0:
+        return None
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def format_ms(value):
+    return "n/a" if value is None else f"{value:,.1f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile PrepPredict import and startup cost")
+    parser.add_argument("modules", nargs="*", help="Modules to profile (default: all app dependencies)")
+    args = parser.parse_args()
+
+    modules = args.modules or MODULES
+
+    print("=" * 60)
+    print("PREPPREDICT - STARTUP PROFILE")
+    print("=" * 60)
+    print(f"\n{'Module':<25}{'Import (cumulative)':>20}{'Process wall':>15}")
+    print("-" * 60)
+
+    for module in modules:
+        cumulative_ms, wall_ms = import_cost(module)
+        if cumulative_ms is None:
+            print(f"{module:<25}{'not installed':>20}{format_ms(wall_ms):>15}")
+        else:
+            print(f"{module:<25}{format_ms(cumulative_ms):>20}{format_ms(wall_ms):>15}")
+
+    if args.modules:
+        return
+
+    print("\n" + "=" * 60)
+    print("STARTUP STEPS (cold process each)")
+    print("=" * 60)
+
+    # (name, untimed setup, timed code); import cost is already reported per module above
+    load_df = "df = pd.read_csv('CET-CUTOFF2025.csv')"
+    steps = [
+        ("Load dataset", "import pandas as pd", load_df),
+        ("Build seat index", f"import pandas as pd\nfrom similar_seats import build_seat_index\n{load_df}",
+         "build_seat_index(df)"),
+        ("Build eligibility curves",
+         f"import pandas as pd\nfrom eligibility import build_eligibility_curves\n{load_df}",
+         "build_eligibility_curves(df)"),
+        ("Sweep all x 1,000 ranks",
+         "import numpy as np\nimport pandas as pd\nfrom eligibility import build_eligibility_curves\n"
+         f"{load_df}\ncurves = build_eligibility_curves(df)",
+         "curves.sweep(np.linspace(1, 200000, 1000))"),
+        ("Load model", "import lazy_loader",
+         f"lazy_loader.load_model({MODEL_FILE!r}, {ENC_FILE!r}, {FEATURE_FILE!r})"),
+    ]
+    for name, setup, code in steps:
+        print(f"{name:<25}{format_ms(step_cost(setup, code)):>20}")
+
+    print("\nHome and Interest-Based Guidance pages import streamlit, pandas, utils and lazy_loader;")
+    print("the seat index, eligibility curves, plotly and scikit-learn wait for the pages that use them.\n")
+
+
+if __name__ == "__main__":
+    main()
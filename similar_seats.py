@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+
+from utils import CASTE_CATEGORIES
+
+# Up to this many seats a vectorized brute force beats building a tree
+BRUTE_FORCE_MAX_ROWS = 5000
+# KD-trees degrade past ~16 dimensions, ball-trees hold up better
+KD_TREE_MAX_DIMS = 16
+
+
+class SeatIndex:
+    """Nearest-neighbour index over the category cutoff vector of each seat"""
+
+    def __init__(self, df, feature_cols=None):
+        self.df = df
+        self.feature_cols = feature_cols or [col for col in CASTE_CATEGORIES if col in df.columns]
+
+        # 0 means "no seat in this category", not rank 0
+        raw = df[self.feature_cols].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+        raw[~(raw > 0)] = np.nan
+
+        # Cutoffs are heavily skewed, so compare them on a log scale
+        logged = np.log1p(raw)
+        with np.errstate(invalid='ignore'):
+            mean = np.nanmean(logged, axis=0)
+            std = np.nanstd(logged, axis=0)
+        mean = np.nan_to_num(mean)
+        std = np.where(np.nan_to_num(std) > 0, std, 1.0)
+        scaled = (logged - mean) / std
+
+        # Most seats only offer a few categories; a missing category takes the seat's
+        # own average competitiveness so distances stay a true metric for the trees
+        present = ~np.isnan(scaled)
+        counts = present.sum(axis=1)
+        row_mean = np.where(present, scaled, 0).sum(axis=1) / np.maximum(counts, 1)
+        self.vectors = np.where(present, scaled, row_mean[:, None])
+
+        # Seats with no cutoff at all have nothing to compare on
+        self.has_cutoffs = counts > 0
+        self._rows = np.flatnonzero(self.has_cutoffs)
+        self._points = self.vectors[self._rows]
+        self._sq_norms = (self._points ** 2).sum(axis=1)
+
+        self.positions = pd.Index(df.index)
+        self.algorithm = self._choose_algorithm()
+        self._tree = self._build_tree() if self.algorithm != 'brute' else None
+
+    def _choose_algorithm(self):
+        n_rows, n_dims = self._points.shape
+        if n_rows <= BRUTE_FORCE_MAX_ROWS:
+            return 'brute'
+        return 'kd_tree' if n_dims <= KD_TREE_MAX_DIMS else 'ball_tree'
+
+    def _build_tree(self):
+        from sklearn.neighbors import BallTree, KDTree
+
+        tree_cls = KDTree if self.algorithm == 'kd_tree' else BallTree
+        return tree_cls(self._points)
+
+    def _search(self, queries, n_fetch):
+        if self._tree is not None:
+            distances, found = self._tree.query(queries, k=n_fetch)
+            return found, distances ** 2
+
+        sq = (queries ** 2).sum(axis=1)[:, None] + self._sq_norms[None, :] - 2 * queries @ self._points.T
+        np.maximum(sq, 0, out=sq)
+        found = np.argpartition(sq, n_fetch - 1, axis=1)[:, :n_fetch]
+        return found, np.take_along_axis(sq, found, axis=1)
+
+    def query_vectors(self, queries, k=5, exclude=None):
+        """Return (positions, distances) of the k nearest seats for each query vector"""
+        queries = np.atleast_2d(np.asarray(queries, dtype=float))
+        extra = 0 if exclude is None else 1
+        n_fetch = min(k + extra, len(self._rows))
+        if n_fetch == 0:
+            empty = np.empty((len(queries), 0))
+            return empty.astype(int), empty
+
+        found, sq = self._search(queries, n_fetch)
+        candidates = self._rows[found]
+        if exclude is not None:
+            sq[candidates == np.asarray(exclude)[:, None]] = np.inf
+
+        order = np.argsort(sq, axis=1, kind='stable')[:, :k]
+        positions = np.take_along_axis(candidates, order, axis=1)
+        distances = np.sqrt(np.take_along_axis(sq, order, axis=1))
+        return positions, distances
+
+    def query_batch(self, row_labels, k=5):
+        """Return (positions, distances) of the k seats most similar to each labelled row"""
+        rows = self.positions.get_indexer(list(row_labels))
+        if (rows < 0).any():
+            raise KeyError(f"Rows not in index: {list(np.asarray(row_labels)[rows < 0])}")
+        positions, distances = self.query_vectors(self.vectors[rows], k=k, exclude=rows)
+        distances[~self.has_cutoffs[rows]] = np.inf
+        return positions, distances
+
+    def query(self, row_label, k=5):
+        """Return the k seats most similar to a row as a DataFrame with a Distance column"""
+        positions, distances = self.query_batch([row_label], k=k)
+        return self.neighbours_frame(positions[0], distances[0])
+
+    def neighbours_frame(self, positions, distances):
+        """Turn one row of query_batch output into a DataFrame, dropping incomparable seats"""
+        keep = np.isfinite(distances)
+        similar = self.df.iloc[positions[keep]].copy()
+        similar['Distance'] = distances[keep]
+        return similar
+
+
+def build_seat_index(df, feature_cols=None):
+    """Build a SeatIndex over the cutoff columns of the dataset"""
+    return SeatIndex(df, feature_cols)
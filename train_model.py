@@ -1,10 +1,20 @@
+import argparse
+import hashlib
+import json
+import math
 import os
+import shutil
+import time
+from datetime import datetime
+import numpy as np
 import pandas as pd
 from sklearn.ensemble import ExtraTreesClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder
-from sklearn.metrics import classification_report, accuracy_score
+from sklearn.metrics import accuracy_score
+from sklearn.tree._tree import Tree
 import joblib
+from utils import CASTE_CATEGORIES
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -14,94 +24,11 @@ DATA_FILE_XLSX = "CET-CUTOFF2025.xlsx"
 MODEL_DIR = "models"
 MODEL_FILE = os.path.join(MODEL_DIR, "ext_model.joblib")
 ENC_FILE = os.path.join(MODEL_DIR, "label_encoder.joblib")
+FEATURE_FILE = os.path.join(MODEL_DIR, "feature_cols.joblib")
+VERSIONS_DIR = os.path.join(MODEL_DIR, "versions")
+MANIFEST_FILE = os.path.join(MODEL_DIR, "manifest.json")
 
-os.makedirs(MODEL_DIR, exist_ok=True)
-
-print("=" * 60)
-print("PREPPREDICT - EXTRA TREES MODEL TRAINING")
-print("=" * 60)
-
-# Load dataset
-if os.path.exists(DATA_FILE_CSV):
-    print(f"\n✓ Loading CSV dataset: {DATA_FILE_CSV}")
-    df = pd.read_csv(DATA_FILE_CSV)
-elif os.path.exists(DATA_FILE_XLSX):
-    print(f"\n✓ Loading Excel dataset: {DATA_FILE_XLSX}")
-    df = pd.read_excel(DATA_FILE_XLSX)
-else:
-    raise FileNotFoundError("No dataset found. Add CET-CUTOFF2025.csv or CET-CUTOFF2025.xlsx")
-
-print(f"✓ Dataset loaded: {df.shape[0]} rows, {df.shape[1]} columns")
-print(f"\nColumns: {df.columns.tolist()}")
-
-# Basic validation
-required_cols = ['College', 'Branch']
-missing_cols = [col for col in required_cols if col not in df.columns]
-if missing_cols:
-    raise ValueError(f"Missing required columns: {missing_cols}")
-
-# Encode college names (target variable)
-print("\n" + "=" * 60)
-print("ENCODING TARGET VARIABLE")
-print("=" * 60)
-
-label_encoder = LabelEncoder()
-df['College_encoded'] = label_encoder.fit_transform(df['College'])
-print(f"✓ Encoded {len(label_encoder.classes_)} unique colleges")
-
-# Select feature columns (caste cutoff ranks)
-print("\n" + "=" * 60)
-print("SELECTING FEATURES")
-print("=" * 60)
-
-# Common caste categories in Karnataka
-caste_categories = [
-    "GM", "1G", "1K", "1R",
-    "2AG", "2AK", "2AR",
-    "2BG", "2BK", "2BR",
-    "3AG", "3AK", "3AR",
-    "3BG", "3BK", "3BR",
-    "GMK", "GMR",
-    "SCG", "SCK", "SCR",
-    "STG", "STK", "STR"
-]
-
-feature_cols = [col for col in caste_categories if col in df.columns]
-
-if not feature_cols:
-    print("⚠ No standard caste columns found. Using all numeric columns...")
-    feature_cols = df.select_dtypes(include=['int64', 'float64']).columns.tolist()
-    feature_cols = [col for col in feature_cols if col != 'College_encoded']
-
-print(f"✓ Selected {len(feature_cols)} features:")
-for i, col in enumerate(feature_cols, 1):
-    print(f"  {i}. {col}")
-
-# Prepare data
-X = df[feature_cols].fillna(0)
-y = df['College_encoded']
-
-print(f"\n✓ Feature matrix shape: {X.shape}")
-print(f"✓ Target vector shape: {y.shape}")
-
-# Train-test split
-print("\n" + "=" * 60)
-print("SPLITTING DATA")
-print("=" * 60)
-
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42, stratify=y
-)
-
-print(f"✓ Training set: {X_train.shape[0]} samples")
-print(f"✓ Testing set: {X_test.shape[0]} samples")
-
-# Train Extra Trees model
-print("\n" + "=" * 60)
-print("TRAINING EXTRA TREES CLASSIFIER")
-print("=" * 60)
-
-model = ExtraTreesClassifier(
+MODEL_PARAMS = dict(
     n_estimators=200,
     max_depth=20,
     min_samples_split=5,
@@ -110,50 +37,416 @@ model = ExtraTreesClassifier(
     n_jobs=-1,
     verbose=1
 )
+TEST_SIZE = 0.2
+
+# Trees added to the forest per incremental run
+DEFAULT_NEW_TREES = 50
+# Below this many new rows there is nothing sensible to hold out for evaluation
+MIN_ROWS_FOR_TEST = 10
+
+
+def banner(title):
+    print("\n" + "=" * 60)
+    print(title)
+    print("=" * 60)
+
+
+def default_data_path():
+    if os.path.exists(DATA_FILE_CSV):
+        return DATA_FILE_CSV
+    if os.path.exists(DATA_FILE_XLSX):
+        return DATA_FILE_XLSX
+    raise FileNotFoundError("No dataset found. Add CET-CUTOFF2025.csv or CET-CUTOFF2025.xlsx")
+
+
+def load_dataset(path=None):
+    """Load a cutoff file; without a path, fall back to the default CSV or Excel dataset"""
+    if path is None:
+        path = default_data_path()
+    elif not os.path.exists(path):
+        raise FileNotFoundError(f"Dataset not found: {path}")
+
+    print(f"\n✓ Loading {'Excel' if path.endswith(('.xlsx', '.xls')) else 'CSV'} dataset: {path}")
+    df = pd.read_excel(path) if path.endswith(('.xlsx', '.xls')) else pd.read_csv(path)
+    print(f"✓ Dataset loaded: {df.shape[0]} rows, {df.shape[1]} columns")
+
+    # Basic validation
+    required_cols = ['College', 'Branch']
+    missing_cols = [col for col in required_cols if col not in df.columns]
+    if missing_cols:
+        raise ValueError(f"Missing required columns: {missing_cols}")
+
+    # Blank separator rows carry no college to learn
+    df = df.dropna(subset=['College']).reset_index(drop=True)
+    return df, path
+
+
+def file_digest(path):
+    """SHA-256 of a data file, used to tell whether it was already ingested"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def select_features(df):
+    """Pick the caste cutoff columns, falling back to every numeric column"""
+    feature_cols = [col for col in CASTE_CATEGORIES if col in df.columns]
+
+    if not feature_cols:
+        print("⚠ No standard caste columns found. Using all numeric columns...")
+        feature_cols = df.select_dtypes(include=['int64', 'float64']).columns.tolist()
+        feature_cols = [col for col in feature_cols if col != 'College_encoded']
+    return feature_cols
+
+
+def prepare_features(df, feature_cols):
+    """Feature matrix with unparseable cutoffs treated like missing ones"""
+    missing_cols = [col for col in feature_cols if col not in df.columns]
+    if missing_cols:
+        raise ValueError(f"Missing feature columns: {missing_cols}")
+    return df[feature_cols].apply(pd.to_numeric, errors='coerce').fillna(0)
+
+
+def split(X, y):
+    """Train-test split, stratified only when both sides can hold every college"""
+    n_classes = y.nunique()
+    n_test = math.ceil(len(y) * TEST_SIZE)
+    can_stratify = (
+        y.value_counts().min() >= 2
+        and n_test >= n_classes
+        and len(y) - n_test >= n_classes
+    )
+    stratify = y if can_stratify else None
+    return train_test_split(X, y, test_size=TEST_SIZE, random_state=42, stratify=stratify)
+
+
+def extend_label_encoder(encoder, colleges):
+    """Append unseen colleges to the encoder so existing codes keep their meaning"""
+    known = set(encoder.classes_)
+    new_colleges = sorted(set(colleges) - known)
+    if new_colleges:
+        encoder.classes_ = np.concatenate([
+            encoder.classes_.astype(object),
+            np.array(new_colleges, dtype=object)
+        ])
+    return new_colleges
+
+
+# align_tree rebuilds trees through scikit-learn's private Tree state layout
+# (written against scikit-learn 1.3.2); extend_forest checks the result
+def align_tree(estimator, columns, n_classes):
+    """Re-index a fitted tree's class columns into the global label space"""
+    tree = estimator.tree_
+    state = tree.__getstate__()
+    values = np.zeros((tree.node_count, tree.n_outputs, n_classes))
+    values[:, :, columns] = state['values'][:, :, :len(columns)]
+    state['values'] = values
+
+    aligned = Tree(tree.n_features, np.array([n_classes], dtype=np.intp), tree.n_outputs)
+    aligned.__setstate__(state)
+    estimator.tree_ = aligned
+    estimator.n_classes_ = n_classes
+    estimator.classes_ = np.arange(n_classes)
+
+
+def extend_forest(model, X, y, n_new_trees, n_classes):
+    """Grow the forest with warm_start on new rows only, keeping every tree on the same labels"""
+    old_classes = model.classes_
+    n_old_trees = len(model.estimators_)
+
+    model.set_params(warm_start=True, n_estimators=n_old_trees + n_new_trees)
+    model.fit(X, y)
+    new_classes = model.classes_
+
+    # The new trees only know the colleges present in this batch and the old trees
+    # only know earlier ones, so spread both over the full, extended label space
+    for i, estimator in enumerate(model.estimators_):
+        forest_classes = old_classes if i < n_old_trees else new_classes
+        align_tree(estimator, forest_classes[estimator.classes_.astype(int)], n_classes)
+    model.classes_ = np.arange(n_classes)
+    model.n_classes_ = n_classes
+    model.set_params(warm_start=False)
+
+    # Refuse to save a forest whose trees no longer agree on the label space
+    try:
+        proba = model.predict_proba(X)
+    except ValueError as e:
+        raise RuntimeError(f"Extended forest is inconsistent: {e}. "
+                           "Check the installed scikit-learn version.") from e
+    if proba.shape[1] != n_classes or not np.allclose(proba.sum(axis=1), 1):
+        raise RuntimeError(
+            f"Extended forest is inconsistent: predict_proba gives {proba.shape[1]} columns "
+            f"for {n_classes} colleges. Check the installed scikit-learn version."
+        )
+    return model
+
+
+def timed_fit(model, X, y):
+    start = time.perf_counter()
+    model.fit(X, y)
+    return time.perf_counter() - start
+
+
+def evaluate(model, X_test, y_test):
+    if X_test is None or len(X_test) == 0:
+        return None
+    return float(accuracy_score(y_test, model.predict(X_test)))
+
+
+def load_manifest():
+    if os.path.exists(MANIFEST_FILE):
+        with open(MANIFEST_FILE) as f:
+            return json.load(f)
+    return {'current': None, 'versions': []}
+
+
+def save_version(model, label_encoder, feature_cols, report, manifest):
+    """Write a numbered copy of the artifacts plus its report, then make it current"""
+    version = max([v['version'] for v in manifest['versions']], default=0) + 1
+    report['version'] = version
+    report['created'] = datetime.now().isoformat(timespec='seconds')
+
+    version_dir = os.path.join(VERSIONS_DIR, f"v{version:03d}")
+    os.makedirs(version_dir, exist_ok=True)
+    joblib.dump(model, os.path.join(version_dir, "ext_model.joblib"))
+    joblib.dump(label_encoder, os.path.join(version_dir, "label_encoder.joblib"))
+    joblib.dump(feature_cols, os.path.join(version_dir, "feature_cols.joblib"))
+    with open(os.path.join(version_dir, "report.json"), 'w') as f:
+        json.dump(report, f, indent=2)
+
+    # The app always loads the current artifacts from models/
+    for name, target in [("ext_model.joblib", MODEL_FILE),
+                         ("label_encoder.joblib", ENC_FILE),
+                         ("feature_cols.joblib", FEATURE_FILE)]:
+        shutil.copyfile(os.path.join(version_dir, name), target)
+
+    manifest['versions'].append({
+        'version': version,
+        'mode': report['mode'],
+        'created': report['created'],
+        'data_files': report['data_files'],
+        'n_estimators': len(model.estimators_),
+        'n_classes': len(label_encoder.classes_),
+    })
+    manifest['current'] = version
+    with open(MANIFEST_FILE, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return version, version_dir
+
+
+def run_full(data_path=None):
+    print("=" * 60)
+    print("PREPPREDICT - EXTRA TREES MODEL TRAINING")
+    print("=" * 60)
+
+    df, data_path = load_dataset(data_path)
+    print(f"\nColumns: {df.columns.tolist()}")
+
+    # Encode college names (target variable)
+    banner("ENCODING TARGET VARIABLE")
+    label_encoder = LabelEncoder()
+    df['College_encoded'] = label_encoder.fit_transform(df['College'])
+    print(f"✓ Encoded {len(label_encoder.classes_)} unique colleges")
+
+    # Select feature columns (caste cutoff ranks)
+    banner("SELECTING FEATURES")
+    feature_cols = select_features(df)
+    print(f"✓ Selected {len(feature_cols)} features:")
+    for i, col in enumerate(feature_cols, 1):
+        print(f"  {i}. {col}")
+
+    # Prepare data
+    X = prepare_features(df, feature_cols)
+    y = df['College_encoded']
+
+    print(f"\n✓ Feature matrix shape: {X.shape}")
+    print(f"✓ Target vector shape: {y.shape}")
+
+    # Train-test split
+    banner("SPLITTING DATA")
+    X_train, X_test, y_train, y_test = split(X, y)
+    print(f"✓ Training set: {X_train.shape[0]} samples")
+    print(f"✓ Testing set: {X_test.shape[0]} samples")
+
+    # Train Extra Trees model
+    banner("TRAINING EXTRA TREES CLASSIFIER")
+    model = ExtraTreesClassifier(**MODEL_PARAMS)
+    print("\nTraining model...")
+    train_seconds = timed_fit(model, X_train, y_train)
+
+    # Evaluate
+    banner("MODEL EVALUATION")
+    accuracy = evaluate(model, X_test, y_test)
+    print(f"\n✓ Accuracy: {accuracy:.2%}")
+    print(f"✓ Training samples: {len(X_train)}")
+    print(f"✓ Testing samples: {len(X_test)}")
+    print(f"✓ Training time: {train_seconds:.2f}s")
+
+    # Feature importance
+    banner("TOP 5 FEATURE IMPORTANCES")
+    feature_importance = pd.DataFrame({
+        'feature': feature_cols,
+        'importance': model.feature_importances_
+    }).sort_values('importance', ascending=False)
+
+    for idx, row in feature_importance.head(5).iterrows():
+        print(f"  {row['feature']}: {row['importance']:.4f}")
+
+    # Save model
+    banner("SAVING MODEL")
+    report = {
+        'mode': 'full',
+        'data_files': [{'path': data_path, 'sha256': file_digest(data_path), 'rows': len(df)}],
+        'test_rows': len(X_test),
+        'full_retrain': {
+            'rows_processed': len(X_train),
+            'trees_trained': len(model.estimators_),
+            'train_seconds': round(train_seconds, 3),
+            'accuracy': accuracy,
+        },
+    }
+    version, version_dir = save_version(model, label_encoder, feature_cols, report, load_manifest())
+
+    print(f"✓ Model saved to: {MODEL_FILE}")
+    print(f"✓ Encoder saved to: {ENC_FILE}")
+    print(f"✓ Feature columns saved")
+    print(f"✓ Version v{version:03d} saved to: {version_dir}")
+
+    banner("TRAINING COMPLETE!")
+    print(f"\n✅ Model accuracy: {accuracy:.2%}")
+    print(f"✅ Ready for deployment\n")
+
+
+def run_incremental(data_path, n_new_trees=DEFAULT_NEW_TREES, compare=False):
+    print("=" * 60)
+    print("PREPPREDICT - INCREMENTAL MODEL TRAINING")
+    print("=" * 60)
+
+    if not (os.path.exists(MODEL_FILE) and os.path.exists(ENC_FILE) and os.path.exists(FEATURE_FILE)):
+        raise FileNotFoundError("No trained model found. Run python train_model.py for a full training first.")
+
+    model = joblib.load(MODEL_FILE)
+    label_encoder = joblib.load(ENC_FILE)
+    feature_cols = joblib.load(FEATURE_FILE)
+    print(f"\n✓ Loaded model with {len(model.estimators_)} trees and {len(label_encoder.classes_)} colleges")
+
+    # Work out which data the current model has already seen
+    manifest = load_manifest()
+    current = next((v for v in manifest['versions'] if v['version'] == manifest['current']), None)
+    if current is not None:
+        history = current['data_files']
+    else:
+        default_path = default_data_path()
+        print(f"⚠ No model manifest found, assuming the model was trained on {default_path}")
+        history = [{'path': default_path, 'sha256': file_digest(default_path)}]
+
+    digest = file_digest(data_path)
+    if any(entry['sha256'] == digest for entry in history):
+        raise ValueError(f"{data_path} has already been ingested into the current model")
+
+    banner("LOADING NEW ROUND DATA")
+    df, data_path = load_dataset(data_path)
+
+    # Encode only the new rows; earlier colleges keep their codes
+    banner("EXTENDING LABEL ENCODER")
+    new_colleges = extend_label_encoder(label_encoder, df['College'])
+    n_classes = len(label_encoder.classes_)
+    y = pd.Series(label_encoder.transform(df['College']), index=df.index)
+    X = prepare_features(df, feature_cols)
+    print(f"✓ {len(new_colleges)} new colleges, {n_classes} in total")
+
+    banner("SPLITTING DATA")
+    if len(df) >= MIN_ROWS_FOR_TEST:
+        X_train, X_test, y_train, y_test = split(X, y)
+    else:
+        print(f"⚠ Fewer than {MIN_ROWS_FOR_TEST} new rows, training on all of them without evaluation")
+        X_train, X_test, y_train, y_test = X, None, y, None
+    print(f"✓ Training set: {len(X_train)} new samples")
+    print(f"✓ Testing set: {0 if X_test is None else len(X_test)} new samples")
+
+    banner("EXTENDING EXTRA TREES FOREST")
+    print(f"\nAdding {n_new_trees} trees to {len(model.estimators_)}...")
+    start = time.perf_counter()
+    extend_forest(model, X_train, y_train, n_new_trees, n_classes)
+    incremental_seconds = time.perf_counter() - start
+    incremental_accuracy = evaluate(model, X_test, y_test)
+
+    report = {
+        'mode': 'incremental',
+        'parent_version': manifest['current'],
+        'data_files': history + [{'path': data_path, 'sha256': digest, 'rows': len(df)}],
+        'new_colleges': new_colleges,
+        'test_rows': 0 if X_test is None else len(X_test),
+        'incremental': {
+            'rows_processed': len(X_train),
+            'trees_trained': n_new_trees,
+            'total_trees': len(model.estimators_),
+            'train_seconds': round(incremental_seconds, 3),
+            'accuracy': incremental_accuracy,
+        },
+        'full_retrain': None,
+    }
 
-print("\nTraining model...")
-model.fit(X_train, y_train)
+    if compare:
+        # Baseline: what a from-scratch retrain on all history plus the new rows costs
+        banner("FULL RETRAIN FOR COMPARISON")
+        frames = [load_dataset(entry['path'])[0] for entry in history if os.path.exists(entry['path'])]
+        if len(frames) < len(history):
+            print("⚠ Some earlier data files are missing, comparing against the ones still available")
+        history_df = pd.concat(frames, ignore_index=True) if frames else df.iloc[:0]
+        X_full = pd.concat([prepare_features(history_df, feature_cols), X_train], ignore_index=True)
+        y_full = pd.concat([pd.Series(label_encoder.transform(history_df['College'])), y_train],
+                           ignore_index=True)
 
-# Evaluate
-print("\n" + "=" * 60)
-print("MODEL EVALUATION")
-print("=" * 60)
+        full_model = ExtraTreesClassifier(**MODEL_PARAMS)
+        full_seconds = timed_fit(full_model, X_full, y_full)
+        report['full_retrain'] = {
+            'rows_processed': len(X_full),
+            'trees_trained': len(full_model.estimators_),
+            'train_seconds': round(full_seconds, 3),
+            'accuracy': evaluate(full_model, X_test, y_test),
+        }
 
-y_pred = model.predict(X_test)
-accuracy = accuracy_score(y_test, y_pred)
+    banner("INCREMENTAL VS FULL RETRAIN")
+    rows = [('incremental', report['incremental']), ('full retrain', report['full_retrain'])]
+    print(f"\n{'':<14}{'Rows':>8}{'Trees':>8}{'Seconds':>10}{'Accuracy':>10}")
+    for name, stats in rows:
+        if stats is None:
+            print(f"{name:<14}{'not run (use --compare)':>36}")
+            continue
+        accuracy = "n/a" if stats['accuracy'] is None else f"{stats['accuracy']:.2%}"
+        print(f"{name:<14}{stats['rows_processed']:>8}{stats['trees_trained']:>8}"
+              f"{stats['train_seconds']:>10.2f}{accuracy:>10}")
 
-print(f"\n✓ Accuracy: {accuracy:.2%}")
-print(f"✓ Training samples: {len(X_train)}")
-print(f"✓ Testing samples: {len(X_test)}")
+    banner("SAVING MODEL")
+    version, version_dir = save_version(model, label_encoder, feature_cols, report, manifest)
+    print(f"✓ Model saved to: {MODEL_FILE}")
+    print(f"✓ Version v{version:03d} and report saved to: {version_dir}")
 
-# Feature importance
-print("\n" + "=" * 60)
-print("TOP 5 FEATURE IMPORTANCES")
-print("=" * 60)
+    banner("INCREMENTAL TRAINING COMPLETE!")
+    print(f"\n✅ Forest now has {len(model.estimators_)} trees over {n_classes} colleges\n")
 
-feature_importance = pd.DataFrame({
-    'feature': feature_cols,
-    'importance': model.feature_importances_
-}).sort_values('importance', ascending=False)
 
-for idx, row in feature_importance.head(5).iterrows():
-    print(f"  {row['feature']}: {row['importance']:.4f}")
+def main():
+    parser = argparse.ArgumentParser(description="Train the PrepPredict Extra Trees model")
+    parser.add_argument("--data", help="Dataset for a full training (default: CET-CUTOFF2025.csv/.xlsx)")
+    parser.add_argument("--incremental", metavar="FILE",
+                        help="Extend the current model with the rows of a newly ingested data file")
+    parser.add_argument("--new-trees", type=int, default=DEFAULT_NEW_TREES,
+                        help=f"Trees to add in incremental mode (default: {DEFAULT_NEW_TREES})")
+    parser.add_argument("--compare", action="store_true",
+                        help="In incremental mode, also run a full retrain and report both")
+    args = parser.parse_args()
 
-# Save model
-print("\n" + "=" * 60)
-print("SAVING MODEL")
-print("=" * 60)
+    os.makedirs(MODEL_DIR, exist_ok=True)
 
-joblib.dump(model, MODEL_FILE)
-joblib.dump(label_encoder, ENC_FILE)
-joblib.dump(feature_cols, os.path.join(MODEL_DIR, "feature_cols.joblib"))
+    if args.incremental:
+        run_incremental(args.incremental, n_new_trees=args.new_trees, compare=args.compare)
+    else:
+        run_full(args.data)
 
-print(f"✓ Model saved to: {MODEL_FILE}")
-print(f"✓ Encoder saved to: {ENC_FILE}")
-print(f"✓ Feature columns saved")
 
-print("\n" + "=" * 60)
-print("TRAINING COMPLETE!")
-print("=" * 60)
-print(f"\n✅ Model accuracy: {accuracy:.2%}")
-print(f"✅ Ready for deployment\n")
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,18 @@
 import pandas as pd
 import random
 
+# Common caste categories in Karnataka
+CASTE_CATEGORIES = [
+    "GM", "1G", "1K", "1R",
+    "2AG", "2AK", "2AR",
+    "2BG", "2BK", "2BR",
+    "3AG", "3AK", "3AR",
+    "3BG", "3BK", "3BR",
+    "GMK", "GMR",
+    "SCG", "SCK", "SCR",
+    "STG", "STK", "STR"
+]
+
 # Skills/Interests mapping for different engineering branches
 BRANCH_SKILLS = {
     'CSE': {
@@ -47,9 +59,22 @@ BRANCH_SKILLS = {
     }
 }
 
+# KEA two-letter branch codes, as used in the cutoff files
+BRANCH_CODE_CATEGORIES = {
+    'CS': 'CSE', 'CO': 'CSE', 'CB': 'CSE', 'CC': 'CSE', 'AI': 'CSE',
+    'IE': 'IT',
+    'EC': 'ECE', 'TC': 'ECE', 'EI': 'ECE',
+    'EE': 'EEE',
+    'ME': 'MECH', 'AU': 'MECH', 'IP': 'MECH',
+    'CE': 'CIVIL', 'CT': 'CIVIL',
+}
+
 def get_branch_category(branch_name):
-    """Categorize branch based on name"""
-    branch_upper = str(branch_name).upper()
+    """Categorize branch based on its code or name"""
+    branch_upper = str(branch_name).strip().upper()
+    
+    if branch_upper in BRANCH_CODE_CATEGORIES:
+        return BRANCH_CODE_CATEGORIES[branch_upper]
     
     if any(x in branch_upper for x in ['COMPUTER', 'CSE', 'CS']):
         return 'CSE'